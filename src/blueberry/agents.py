@@ -1,4 +1,3 @@
-from lumos import lumos
 from blueberry.models import (
     Intent,
     ProjectSpec,
@@ -6,13 +5,21 @@ from blueberry.models import (
     FileMode,
     FileContent,
     BuildError,
-    BuildErrorReport
+    BuildErrorReport,
+    BatchPlan,
+    ItemPlan,
+    INTENT_SCHEMA,
+    PROJECT_SPEC_SCHEMA,
 )
 from rich.console import Console
 from rich.prompt import Prompt
+from rich.table import Table
+from rich.console import Group
+from rich.text import Text
 import typer
-import json
+import orjson
 import os
+import sys
 import subprocess
 from datetime import datetime
 from pathlib import Path
@@ -22,18 +29,128 @@ from typing import List, Dict
 import shutil
 from rich.progress import SpinnerColumn, TextColumn
 import asyncio
+import contextlib
+import hashlib
+from collections import defaultdict
 from fnmatch import fnmatch
 from blueberry.repair_agent import RepairAgent
+from blueberry.llm import LLM_LONG_TIMEOUT, LLM_TIMEOUT, call_ai_async, llm_retry
+from blueberry.llm_cache import cached_llm, SemanticCache
+from openai import OpenAI
+import httpx
+from pydantic import BaseModel
+
+
+# Upper bound on in-flight LLM requests, keeps concurrent planning under provider rate limits
+MAX_CONCURRENT_LLM_CALLS = 10
+# Number of spec items planned per LLM call, sized to keep responses well inside the context window
+PLAN_BATCH_SIZE = 5
+
+# Invariant guidance for code generation, kept at the start of the system prompt so
+# every planning request shares the same cacheable prefix
+NEXTJS_SYSTEM_PROMPT = """You are an expert Next.js developer.
+Generate or modify the files needed to implement features of a Next.js 14 application.
+The application already has a basic structure with auth and Supabase integration.
+
+Make sure to:
+1. Use the exact table names and columns from the SQL schema
+2. Follow the database relationships defined in migrations
+3. Include proper type definitions for database tables
+4. Add proper error handling for database operations
+Do not regenerate unchanged boilerplate files.
+"""
+
+# Keep-alive pool shared by every request of a client, large enough for concurrent planning
+HTTP_LIMITS = httpx.Limits(max_keepalive_connections=64, max_connections=128)
+# Default read timeout fits long generations; short calls pass a tighter per-request timeout
+HTTP_TIMEOUT = httpx.Timeout(LLM_LONG_TIMEOUT, connect=5.0)
+
+
+def create_openai_client() -> OpenAI:
+    """Create an OpenAI client that reuses pooled HTTP/2 connections.
+
+    Built-in retries are disabled, retries are handled by llm_retry.
+    """
+    http_client = httpx.Client(http2=True, limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT)
+    return OpenAI(http_client=http_client, max_retries=0)
+
+
+# Structured output formats, built once from the precomputed model schemas
+RESPONSE_FORMATS = {
+    model: {
+        "type": "json_schema",
+        "json_schema": {"name": model.__name__, "schema": schema, "strict": True},
+    }
+    for model, schema in ((Intent, INTENT_SCHEMA), (ProjectSpec, PROJECT_SPEC_SCHEMA))
+}
+
+# Source files whose exports are listed in the codebase manifest
+SOURCE_SUFFIXES = {".ts", ".tsx", ".js", ".jsx"}
+MANIFEST_SKIP_DIRS = {"node_modules", ".next", ".backups", ".git", ".cache"}
+# Per-file exports are cached between runs; bump the version when extraction changes
+MANIFEST_CACHE_FILE = Path(".cache") / "codebase_manifest.json"
+MANIFEST_VERSION = 1
+EXPORT_PATTERN = re.compile(
+    r"^export\s+(?:default\s+)?(?:async\s+)?(?:function|const|let|class|interface|type|enum)\s+(\w+)",
+    re.MULTILINE,
+)
+
+
+def _project_path(path: str) -> str:
+    """Normalize a model-supplied file path to a project-relative key"""
+    return os.path.normpath(path.lstrip("/"))
+
+
+def _route_path(segments: tuple[str, ...]) -> str:
+    """URL path of an app router directory, ignoring (group) segments"""
+    return "/" + "/".join(
+        segment for segment in segments if not (segment.startswith("(") and segment.endswith(")"))
+    )
 
 
 class ProjectBuilder:
-    def __init__(self):
-        self.console = Console()
+    def __init__(self, client: OpenAI = None):
+        # Skip styling work when output is piped or redirected
+        if sys.stdout.isatty():
+            self.console = Console()
+        else:
+            self.console = Console(soft_wrap=True, force_terminal=False)
+        self.client = client or create_openai_client()
+        self.feature_cache = SemanticCache(self.client)
+
+    def close(self) -> None:
+        """Close the underlying HTTP connection pool"""
+        self.client.close()
+
+    def __enter__(self) -> "ProjectBuilder":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @cached_llm
+    @llm_retry
+    def _parse(
+        self,
+        *,
+        messages: List[Dict[str, str]],
+        model: str,
+        response_format: type[BaseModel],
+        timeout: float = LLM_TIMEOUT,
+    ):
+        """Structured completion using the provider's native schema enforcement"""
+        completion = self.client.chat.completions.create(
+            model=model,
+            messages=messages,
+            response_format=RESPONSE_FORMATS[response_format],
+            timeout=timeout,
+        )
+        return response_format.model_validate_json(completion.choices[0].message.content)
 
     def understand_intent(self, user_input: str) -> Intent:
         """Understand the user's intent from the user's input."""
         try:
-            intent = lumos.call_ai(
+            intent = self._parse(
                 messages=[
                     {
                         "role": "system",
@@ -66,6 +183,10 @@ class ProjectBuilder:
         Returns:
             str: The validated/enhanced feature description
         """
+        return self.feature_cache.get_or_compute(feature, self._enhance_feature)
+
+    def _enhance_feature(self, feature: str) -> str:
+        """Ask the model for an enhanced version of a feature description"""
         system_prompt = """You are an expert in writing clear, specific feature descriptions for web applications.
         Given a feature description, enhance it to be more specific and actionable.
 
@@ -79,7 +200,7 @@ class ProjectBuilder:
         Example Output: "Email and social authentication with JWT tokens and password reset"
         """
 
-        _intent = lumos.call_ai(
+        _intent = self._parse(
             messages=[
                 {
                     "role": "system",
@@ -91,7 +212,7 @@ class ProjectBuilder:
             model="gpt-4o",
         )
 
-        return feature
+        return _intent.features[0] if _intent.features else feature
 
     def verify_with_user_loop(self, intent: Intent, max_attempts=3) -> Intent:
         """Verify the intent with the user, iterate with feedback and returns the final intent.
@@ -104,14 +225,12 @@ class ProjectBuilder:
             Intent: The verified and potentially modified intent
         """
 
-        console = Console()
+        console = self.console
 
         attempts = 0
         while attempts < max_attempts:
             # Display current features
-            console.print("\n[bold yellow]Current features:[/bold yellow]")
-            for i, feature in enumerate(intent.features, 1):
-                console.print(f"{i}. {feature}")
+            self._print_features("Current features", intent.features)
 
             if not typer.confirm(
                 "\nWould you like to modify these features?",
@@ -121,10 +240,12 @@ class ProjectBuilder:
                 break
 
             # Show modification options
-            console.print("\n[bold]Options:[/bold]")
-            console.print("1. Add a feature")
-            console.print("2. Remove a feature")
-            console.print("3. Done modifying")
+            console.print(
+                "\n[bold]Options:[/bold]\n"
+                "1. Add a feature\n"
+                "2. Remove a feature\n"
+                "3. Done modifying"
+            )
 
             choice = Prompt.ask("What would you like to do?", choices=["1", "2", "3"])
 
@@ -155,7 +276,7 @@ class ProjectBuilder:
                         status.stop()
                         console.print(f"[red]Error validating feature: {e}[/red]")
 
-                intent.features.append(new_feature)
+                intent = Intent(features=[*intent.features, new_feature])
 
             elif choice == "2":
                 if not intent.features:
@@ -173,7 +294,13 @@ class ProjectBuilder:
                     )
                     - 1
                 )
-                intent.features.pop(remove_idx)
+                intent = Intent(
+                    features=[
+                        feature
+                        for i, feature in enumerate(intent.features)
+                        if i != remove_idx
+                    ]
+                )
 
             else:  # choice == "3"
                 break
@@ -181,12 +308,19 @@ class ProjectBuilder:
             attempts += 1
 
             # Show updated features
-            console.print("\n[bold yellow]Updated features:[/bold yellow]")
-            for i, feature in enumerate(intent.features, 1):
-                console.print(f"{i}. {feature}")
+            self._print_features("Updated features", intent.features)
 
         return intent
 
+    def _print_features(self, title: str, features: List[str]) -> None:
+        """Render a numbered feature list in a single console write"""
+        table = Table(show_header=False, box=None, padding=(0, 1, 0, 0))
+        for i, feature in enumerate(features, 1):
+            table.add_row(f"{i}.", feature)
+        self.console.print(
+            Group(Text.from_markup(f"\n[bold yellow]{title}:[/bold yellow]"), table)
+        )
+
     def create_spec(self, intent: Intent) -> ProjectSpec:
         """Create a detailed project specification based on the intent and save it to a file."""
         try:
@@ -196,7 +330,7 @@ class ProjectBuilder:
             with open(prompt_path, "r") as f:
                 core_prompt = f.read()
 
-            spec = lumos.call_ai(
+            spec = self._parse(
                 messages=[
                     {
                         "role": "system",
@@ -220,11 +354,12 @@ class ProjectBuilder:
                     },
                     {
                         "role": "user",
-                        "content": f"Generate specification for: {json.dumps(intent.model_dump(), indent=2)}",
+                        "content": f"Generate specification for: {intent.model_dump_json(indent=2)}",
                     },
                 ],
                 response_format=ProjectSpec,
                 model="gpt-4o",
+                timeout=LLM_LONG_TIMEOUT,
             )
 
             return spec
@@ -260,7 +395,7 @@ class ProjectBuilder:
             )
 
             # Create Supabase agent and run setup
-            supabase_agent = SupabaseSetupAgent(spec, os.getcwd())
+            supabase_agent = SupabaseSetupAgent(spec, os.getcwd(), client=self.client)
             supabase_agent.setup(project_ref, anon_key, service_key)
             return True
 
@@ -279,11 +414,17 @@ class CodeAgent:
     def __init__(self, project_path: str, spec: ProjectSpec, ignore_patterns: List[str] = None):
         self.project_path = Path(project_path)
         self.spec = spec
+        # Serialized once, the spec summary is embedded in every generation prompt;
+        # full item details are only sent with the batch that implements them
+        self._spec_summary_json = orjson.dumps(spec.summary(), option=orjson.OPT_INDENT_2).decode()
         self.console = Console()
         self.ignore_patterns = ignore_patterns or []
         self.existing_files = self._map_existing_files()
+        self._manifest = self._build_manifest()
         self.current_dir = Path(__file__).parent
         self.repair_agent = RepairAgent(project_path)
+        self._llm_semaphore = asyncio.Semaphore(MAX_CONCURRENT_LLM_CALLS)
+        self._path_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
 
         # Create logs directory
         log_dir = Path("logs")
@@ -302,12 +443,97 @@ class CodeAgent:
         for file_path in self.project_path.rglob("*"):
             if file_path.is_file():
                 relative_path = str(file_path.relative_to(self.project_path))
-                # Skip .git files and ignored patterns
-                if not relative_path.startswith(".git/") and not self._should_ignore(relative_path):
+                # Skip .git files, blueberry's own cache and ignored patterns
+                if (
+                    not relative_path.startswith((".git/", ".cache/"))
+                    and not self._should_ignore(relative_path)
+                ):
                     files[relative_path] = file_path
                     self.console.print(f"[dim]Found: {relative_path}[/dim]")
         return files
 
+    def _build_manifest(self) -> Dict[str, list]:
+        """Summarize the existing source tree once for every planning prompt.
+
+        Lists all files plus the exported symbols of components, pages and API
+        routes, so the model does not have to rediscover them on each call.
+        """
+        manifest = {
+            "files": sorted(self.existing_files),
+            "components": [],
+            "pages": [],
+            "api_routes": [],
+        }
+        cached_entries = self._load_manifest_cache()
+        entries = {}
+        for relative_path, file_path in sorted(self.existing_files.items()):
+            path = Path(relative_path)
+            if path.suffix not in SOURCE_SUFFIXES or path.parts[0] in MANIFEST_SKIP_DIRS:
+                continue
+            entry = self._manifest_entry(file_path, cached_entries.get(relative_path))
+            if entry is None:
+                continue
+            entries[relative_path] = entry
+            exports = entry["exports"]
+
+            parts = path.parts[1:] if path.parts[0] == "src" else path.parts
+            if parts[0] == "app" and path.stem == "route":
+                manifest["api_routes"].append(
+                    {"path": _route_path(parts[1:-1]), "file": relative_path, "methods": exports}
+                )
+            elif parts[0] == "app" and path.stem == "page":
+                manifest["pages"].append(
+                    {"path": _route_path(parts[1:-1]), "file": relative_path, "exports": exports}
+                )
+            elif exports:
+                manifest["components"].append({"file": relative_path, "exports": exports})
+
+        self._save_manifest_cache(entries)
+        return manifest
+
+    def _manifest_entry(self, file_path: Path, cached: Dict | None) -> Dict | None:
+        """Exports of one source file, reusing the cached entry if the file is unchanged"""
+        try:
+            stat = file_path.stat()
+            if cached and cached["mtime_ns"] == stat.st_mtime_ns and cached["size"] == stat.st_size:
+                return cached
+
+            content = file_path.read_bytes()
+        except OSError:
+            return None
+
+        digest = hashlib.sha256(content).hexdigest()
+        if cached and cached["sha256"] == digest:
+            exports = cached["exports"]
+        else:
+            exports = EXPORT_PATTERN.findall(content.decode(errors="ignore"))
+        return {
+            "sha256": digest,
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "exports": exports,
+        }
+
+    def _load_manifest_cache(self) -> Dict[str, Dict]:
+        """Per-file manifest entries from the previous run, if still valid"""
+        cache_file = self.project_path / MANIFEST_CACHE_FILE
+        try:
+            cached = orjson.loads(cache_file.read_bytes())
+        except (OSError, orjson.JSONDecodeError):
+            return {}
+        if cached.get("version") != MANIFEST_VERSION:
+            return {}
+        return cached.get("files", {})
+
+    def _save_manifest_cache(self, entries: Dict[str, Dict]) -> None:
+        """Persist per-file manifest entries for the next run"""
+        cache_file = self.project_path / MANIFEST_CACHE_FILE
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            cache_file.write_bytes(orjson.dumps({"version": MANIFEST_VERSION, "files": entries}))
+        except OSError:
+            pass
+
     def _log_ai_response(self, prompt: str, response: any, type: str = "generation"):
         """Log AI prompt and response"""
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -318,8 +544,10 @@ class CodeAgent:
             f.write("\n--- Prompt ---\n")
             f.write(prompt)
             f.write("\n\n--- Response ---\n")
-            if isinstance(response, (dict, list)):
-                f.write(json.dumps(response, indent=2))
+            if isinstance(response, BaseModel):
+                f.write(response.model_dump_json(indent=2))
+            elif isinstance(response, (dict, list)):
+                f.write(orjson.dumps(response, option=orjson.OPT_INDENT_2).decode())
             else:
                 f.write(str(response))
             f.write(f"\n{'=' * 80}\n")
@@ -331,6 +559,9 @@ class CodeAgent:
             TextColumn("[progress.description]{task.description}"),
             console=self.console,
         ) as progress:
+            # Installing dependencies does not depend on the generated code,
+            # so run it while the LLM is planning instead of before the build
+            install_task = asyncio.create_task(self._install_dependencies())
             try:
                 # 1. Generate structured code
                 task = progress.add_task(
@@ -343,13 +574,22 @@ class CodeAgent:
                 task = progress.add_task(
                     "[cyan]Applying changes...", total=len(generated.files)
                 )
-                for file in generated.files:
-                    await self._apply_single_change(file)
+                for change in asyncio.as_completed(
+                    [self._apply_single_change(file) for file in generated.files]
+                ):
+                    await change
                     progress.advance(task)
 
                 # 3. Run build and fix errors
                 task = progress.add_task("[cyan]Running build check...", total=None)
-                if errors := await self._run_build():
+                # Install failures surface again through the build itself
+                with contextlib.suppress(Exception):
+                    await install_task
+                # Reinstall only if the generated code touched the manifest
+                manifest_changed = any(
+                    _project_path(file.path) == "package.json" for file in generated.files
+                )
+                if errors := await self._run_build(install=manifest_changed):
                     self.console.print(
                         "\n[yellow]Found build errors, attempting repairs...[/yellow]"
                     )
@@ -359,11 +599,116 @@ class CodeAgent:
                 return True
 
             except Exception as e:
+                install_task.cancel()
+                with contextlib.suppress(asyncio.CancelledError, Exception):
+                    await install_task
                 self.console.print(f"[red]Error in code generation: {str(e)}[/red]")
                 return False
 
     async def _generate_structured_code(self) -> GeneratedCode:
-        """Generate code with structured output format"""
+        """Generate code with structured output format.
+
+        Spec items are planned in batches of PLAN_BATCH_SIZE per LLM call so the
+        shared project context is sent once per batch rather than once per item.
+        Batches are independent and dispatched concurrently.
+        """
+        system_prompt = self._build_system_prompt()
+        structure = self.spec.structure
+
+        batches = [
+            (kind, items[i : i + PLAN_BATCH_SIZE])
+            for kind, items in (
+                ("component", structure.components),
+                ("API route", structure.api_routes),
+                ("database table", structure.database),
+                ("page", structure.pages),
+            )
+            for i in range(0, len(items), PLAN_BATCH_SIZE)
+        ]
+        plans = await asyncio.gather(
+            *[self._plan_items(items, kind, system_prompt) for kind, items in batches]
+        )
+
+        # Several items may edit the same file (e.g. shared type definitions),
+        # collect every edit per path so each file is written exactly once
+        edit_queue: Dict[str, List[FileContent]] = defaultdict(list)
+        seen_edits = set()
+        dependencies: List[str] = []
+        for plan in plans:
+            for item in plan:
+                for file in item.files:
+                    path = _project_path(file.path)
+                    digest = hashlib.sha256(file.content.encode()).hexdigest()
+                    if (path, digest) not in seen_edits:
+                        seen_edits.add((path, digest))
+                        edit_queue[path].append(file)
+                dependencies.extend(dep for dep in item.dependencies if dep not in dependencies)
+
+        merged = await asyncio.gather(
+            *[self._coalesce_edits(path, edits, system_prompt) for path, edits in edit_queue.items()]
+        )
+        return GeneratedCode(
+            files=[file for file in merged if not self._is_unchanged(file)],
+            dependencies=dependencies,
+        )
+
+    async def _coalesce_edits(
+        self, path: str, edits: List[FileContent], system_prompt: str
+    ) -> FileContent:
+        """Combine all edits targeting one file into a single edit"""
+        if len(edits) == 1:
+            return edits[0]
+
+        current = ""
+        if path in self.existing_files:
+            current = self.existing_files[path].read_text(errors="ignore")
+        snippets = "\n\n".join(
+            f"--- Version {i} ---\n{edit.content}" for i, edit in enumerate(edits, 1)
+        )
+        prompt = f"""Several independently planned changes target the same file: {path}
+        Merge them into one complete file that keeps everything each version adds.
+
+        Current content:
+        {current or "(new file)"}
+
+        {snippets}
+        """
+
+        async with self._llm_semaphore:
+            self.console.print(f"[dim]Merging {len(edits)} edits to {path}[/dim]")
+            response = await call_ai_async(
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": prompt},
+                ],
+                response_format=FileContent,
+                model="gpt-4o",
+                timeout=LLM_LONG_TIMEOUT,
+            )
+
+        self._log_ai_response(prompt, response, "merge_edits")
+
+        mode = FileMode.MODIFY if path in self.existing_files else FileMode.CREATE
+        return FileContent(path=path, content=response.content, mode=mode)
+
+    def _is_unchanged(self, file: FileContent) -> bool:
+        """Check whether an edit would leave an existing file as it is"""
+        existing = self.existing_files.get(_project_path(file.path))
+        if existing is None:
+            return False
+        try:
+            return existing.read_text() == file.content
+        except (OSError, ValueError):
+            # Unreadable or binary files (e.g. favicon.ico) are treated as changed
+            return False
+
+    def _build_system_prompt(self) -> str:
+        """Build the system prompt shared by every planning call.
+
+        Everything that is invariant across planning calls lives here, so that
+        every request starts with a byte-identical prefix that the provider can
+        serve from its prompt cache.
+        """
         core_prompt = (self.current_dir / "prompts" / "core_prompt.md").read_text()
 
         # Read existing migration file if it exists
@@ -373,14 +718,12 @@ class CodeAgent:
             migration_sql = file.read_text()
             break  # Take the first matching file
 
-        prompt = f"""Based on the following project specification, generate or modify files for a Next.js 14 application.
-        The application already has a basic structure with auth and Supabase integration.
+        return f"""{NEXTJS_SYSTEM_PROMPT}
+        Project Spec (summary):
+        {self._spec_summary_json}
         
-        Project Spec:
-        {self.spec.model_dump_json(indent=2)}
-        
-        Existing files structure:
-        {self._get_files_structure()}
+        Existing codebase manifest (files and exported symbols):
+        {orjson.dumps(self._manifest).decode()}
         
         Database Schema (Supabase):
         ```sql
@@ -389,34 +732,81 @@ class CodeAgent:
         
         Boilerplate Context:
         {core_prompt}
-        
-        Generate all the necessary new files (components, pages, api routes) or modifications to existing files.
-        Make sure to:
-        1. Use the exact table names and columns from the SQL schema
-        2. Follow the database relationships defined in migrations
-        3. Include proper type definitions for database tables
-        4. Add proper error handling for database operations
-        Do not regenerate unchanged boilerplate files.
         """
 
-        response = await lumos.call_ai_async(
-            messages=[
-                {"role": "system", "content": "You are an expert Next.js developer..."},
-                {"role": "user", "content": prompt},
-            ],
-            response_format=GeneratedCode,
-            model="gpt-4o",
+    async def _plan_items(
+        self, items: List[BaseModel], kind: str, system_prompt: str
+    ) -> List[ItemPlan]:
+        """Plan a batch of spec items, making sure each item gets exactly one plan.
+
+        Items the model leaves out of its response are planned once more in a
+        follow-up call; anything still missing after that is reported.
+        """
+        planned = self._index_plans(await self._plan_batch(items, kind, system_prompt), len(items))
+
+        if missing := [index for index in range(len(items)) if index not in planned]:
+            retry = await self._plan_batch([items[i] for i in missing], kind, system_prompt)
+            for index, item in self._index_plans(retry, len(missing)).items():
+                planned[missing[index]] = item
+
+        if unplanned := [index for index in range(len(items)) if index not in planned]:
+            names = ", ".join(
+                getattr(items[i], "name", None) or getattr(items[i], "path", str(i))
+                for i in unplanned
+            )
+            self.console.print(f"[yellow]Warning: no plan returned for {kind}(s): {names}[/yellow]")
+
+        return [planned[index] for index in sorted(planned)]
+
+    @staticmethod
+    def _index_plans(plan: BatchPlan, count: int) -> Dict[int, ItemPlan]:
+        """Map item index to its plan, dropping out-of-range and duplicate indices"""
+        planned: Dict[int, ItemPlan] = {}
+        for item in plan.items:
+            if 0 <= item.index < count and item.index not in planned:
+                planned[item.index] = item
+        return planned
+
+    async def _plan_batch(self, items: List[BaseModel], kind: str, system_prompt: str) -> BatchPlan:
+        """Ask the model to plan several spec items of the same kind in one call"""
+        items_json = "\n".join(
+            f"[{index}] {item.model_dump_json(indent=2)}" for index, item in enumerate(items)
         )
+        prompt = f"""Plan implementation for the following {kind}s. For each, return an object in the items array
+        keyed by its index, containing only the files needed for that {kind}:
+        {items_json}
+        """
+
+        async with self._llm_semaphore:
+            self.console.print(f"[dim]Planning {len(items)} {kind}(s)[/dim]")
+            response = await call_ai_async(
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": prompt},
+                ],
+                response_format=BatchPlan,
+                model="gpt-4o",
+                timeout=LLM_LONG_TIMEOUT,
+            )
 
         # Log the raw response
-        self._log_ai_response(prompt, response.model_dump(), "initial_generation")
+        self._log_ai_response(prompt, response, f"{kind}_generation")
 
         return response
 
     async def _apply_single_change(self, file: FileContent):
-        """Apply a single file change"""
+        """Apply a single file change.
+
+        Writes run in worker threads so independent files are written
+        concurrently; edits to the same path are serialized by a per-path lock.
+        """
+        async with self._path_locks[_project_path(file.path)]:
+            await asyncio.to_thread(self._write_change, file)
+
+    def _write_change(self, file: FileContent):
+        """Write a single file change to disk, backing up modified files"""
         try:
-            relative_path = file.path.lstrip("/")
+            relative_path = _project_path(file.path)
             full_path = self.project_path / relative_path
 
             self.console.print(f"[cyan]Processing: {relative_path}[/cyan]")
@@ -447,19 +837,29 @@ class CodeAgent:
                 shutil.copy2(backup_path, full_path)
                 self.console.print(f"[yellow]Restored backup: {file.path}[/yellow]")
 
-    async def _run_build(self) -> List[BuildError]:
+    async def _install_dependencies(self) -> None:
+        """Run npm install in the project"""
+        install_process = await asyncio.create_subprocess_exec(
+            "npm",
+            "install",
+            cwd=str(self.project_path),
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            await install_process.communicate()
+        except asyncio.CancelledError:
+            install_process.kill()
+            await install_process.wait()
+            raise
+
+    async def _run_build(self, install: bool = True) -> List[BuildError]:
         """Run next build and parse errors"""
         self.console.print("[cyan]Running build...[/cyan]")
         try:
             # First install dependencies if needed
-            install_process = await asyncio.create_subprocess_exec(
-                "npm",
-                "install",
-                cwd=str(self.project_path),
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-            )
-            await install_process.communicate()
+            if install:
+                await self._install_dependencies()
 
             # Then run the build with detailed error reporting
             process = await asyncio.create_subprocess_exec(
@@ -508,7 +908,7 @@ class CodeAgent:
             Build Output:
             {build_output}"""
 
-            response = await lumos.call_ai_async(
+            response = await call_ai_async(
                 messages=[
                     {"role": "system", "content": "You are an expert at analyzing Next.js and TypeScript build errors."},
                     {"role": "user", "content": prompt}
@@ -595,21 +995,30 @@ class CodeAgent:
         except Exception as e:
             self.console.print(f"[red]Error during repair: {str(e)}[/red]")
 
-    def _get_files_structure(self) -> str:
-        """Get a string representation of existing files structure"""
-        return "\n".join(sorted(self.existing_files.keys()))
-
 
 class SupabaseSetupAgent:
-    def __init__(self, spec: ProjectSpec, project_path: str):
+    def __init__(self, spec: ProjectSpec, project_path: str, client: OpenAI = None):
         self.spec = spec
         self.project_path = project_path
         self.console = Console()
+        self._client = client
+
+    @property
+    def client(self) -> OpenAI:
+        """OpenAI client, created on first use so setup commands work without an API key"""
+        if self._client is None:
+            self._client = create_openai_client()
+        return self._client
+
+    @llm_retry
+    def _call_llm(self, **kwargs):
+        """Chat completion with retries on transient errors"""
+        return self.client.chat.completions.create(**kwargs)
 
     def get_migration_sql(self) -> str:
         """Generate SQL migration based on the spec"""
         try:
-            migrations = lumos.call_ai(
+            completion = self._call_llm(
                 messages=[
                     {
                         "role": "system",
@@ -624,12 +1033,13 @@ class SupabaseSetupAgent:
                     },
                     {
                         "role": "user",
-                        "content": f"Generate pgsql migration for: {json.dumps(self.spec.model_dump(), indent=2)}",
+                        "content": f"Generate pgsql migration for: {self.spec.model_dump_json(indent=2)}",
                     },
                 ],
                 model="gpt-4o",
+                timeout=LLM_LONG_TIMEOUT,
             )
-            return migrations
+            return completion.choices[0].message.content
         except Exception as e:
             self.console.print(f"[red]Failed to generate SQL migration: {e}[/red]")
             raise
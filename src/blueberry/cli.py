@@ -18,6 +18,7 @@ import sys
 import rich.box
 import re
 import shutil
+import tempfile
 
 # Terminal symbols with graceful fallback for non-Unicode terminals
 SYMBOLS = {
@@ -299,113 +300,142 @@ def create(
         raise typer.Exit(1)
 
 
-async def generate_app(prompt: str, quiet: bool = False):
-    """Generate application from prompt"""
-    builder = ProjectBuilder()
-
-    # Analyze requirements
-    with create_progress() as progress:
-        task = progress.add_task("📝 Analyzing requirements...")
-        try:
-            intent = builder.understand_intent(prompt)
-            progress.update(task, completed=True)
-        except Exception as e:
-            raise Exception(f"Failed to analyze requirements: {str(e)}")
-
-    if not quiet:
-        console.print("\n" + format_message("info", "Planned features:"))
-        display_features(intent.features)
-
-    # Verify features
-    if not quiet and typer.confirm("\nModify features?", default=False):
-        try:
-            intent = builder.verify_with_user_loop(intent)
-        except Exception as e:
-            raise Exception(f"Failed to modify features: {str(e)}")
+def start_template_clone(destination: str) -> subprocess.Popen:
+    """Start cloning the Next.js + Supabase boilerplate into destination.
 
-    # Generate specification
-    with create_progress() as progress:
-        task = progress.add_task("🔨 Generating specification...")
-        try:
-            spec = builder.create_spec(intent)
-            progress.update(task, completed=True)
-        except Exception as e:
-            raise Exception(f"Failed to generate specification: {str(e)}")
-
-    console.print("\n" + format_message("success", "Specification ready!"))
-
-    # Confirm project creation
-    if not quiet and not typer.confirm("\nCreate project?", default=True):
-        console.print(format_message("info", "Operation cancelled"))
-        return
+    The clone runs in its own process; wait on it with finish_template_clone
+    or kill it if the template is not needed.
+    """
+    return subprocess.Popen(
+        [
+            "git",
+            "clone",
+            "--depth=1",
+            "--quiet",
+            "https://github.com/iminoaru/boilerplate.git",
+            destination,
+        ],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+
+
+def finish_template_clone(clone: subprocess.Popen) -> None:
+    """Wait for a clone started by start_template_clone and check it succeeded"""
+    _, stderr = clone.communicate()
+    if clone.returncode != 0:
+        raise Exception(f"Failed to clone template: {stderr}")
 
-    try:
-        project_name = spec.name.lower().replace(" ", "-")
 
-        # Clone template
+async def generate_app(prompt: str, quiet: bool = False):
+    """Generate application from prompt"""
+    # The builder's client is also used by the Supabase setup step below
+    with ProjectBuilder() as builder:
+        # Analyze requirements
         with create_progress() as progress:
-            task = progress.add_task("📦 Preparing project...")
+            task = progress.add_task("📝 Analyzing requirements...")
             try:
-                subprocess.run(
-                    [
-                        "git",
-                        "clone",
-                        "--depth=1",
-                        "--quiet",
-                        "https://github.com/iminoaru/boilerplate.git",
-                        project_name,
-                    ],
-                    check=True,
-                    stdout=subprocess.DEVNULL,
-                    stderr=subprocess.PIPE,
-                    text=True,
-                )
+                intent = builder.understand_intent(prompt)
                 progress.update(task, completed=True)
-            except subprocess.CalledProcessError as e:
-                raise Exception(f"Failed to clone template: {e.stderr}")
+            except Exception as e:
+                raise Exception(f"Failed to analyze requirements: {str(e)}")
 
-        project_path = os.path.abspath(project_name)
         if not quiet:
-            console.print(
-                format_message("info", f"Project location: [bold]{project_path}[/bold]")
-            )
+            console.print("\n" + format_message("info", "Planned features:"))
+            display_features(intent.features)
+
+        # Verify features
+        if not quiet and typer.confirm("\nModify features?", default=False):
+            try:
+                intent = builder.verify_with_user_loop(intent)
+            except Exception as e:
+                raise Exception(f"Failed to modify features: {str(e)}")
 
-        # Setup project
-        original_dir = os.getcwd()
-        os.chdir(project_path)
+        # Fetch the boilerplate while the specification is generated, the clone
+        # does not depend on the spec and would otherwise run after it
+        template_dir = tempfile.mkdtemp(prefix="berry-template-")
+        clone = start_template_clone(template_dir)
 
         try:
-            # Setup Supabase
-            if not quiet:
-                console.print("\n" + format_message("info", "Configuring Supabase..."))
-            if not builder.setup_supabase(spec):
-                raise Exception("Supabase setup failed")
+            # Generate specification
+            with create_progress() as progress:
+                task = progress.add_task("🔨 Generating specification...")
+                try:
+                    spec = builder.create_spec(intent)
+                    progress.update(task, completed=True)
+                except Exception as e:
+                    raise Exception(f"Failed to generate specification: {str(e)}")
+
+            console.print("\n" + format_message("success", "Specification ready!"))
+
+            # Confirm project creation
+            if not quiet and not typer.confirm("\nCreate project?", default=True):
+                console.print(format_message("info", "Operation cancelled"))
+                return
+
+            project_name = spec.name.lower().replace(" ", "-")
+            if os.path.exists(project_name):
+                raise Exception(
+                    f"Directory '{project_name}' already exists, remove it or run from another directory"
+                )
 
-            # Generate code
+            # Move the prefetched template into place
             with create_progress() as progress:
-                task = progress.add_task("🚀 Generating application...")
-                code_agent = CodeAgent(project_path, spec)
-                success = await code_agent.transform_template()
-                if not success:
-                    raise Exception("Code generation failed")
+                task = progress.add_task("📦 Preparing project...")
+                finish_template_clone(clone)
+                shutil.move(template_dir, project_name)
                 progress.update(task, completed=True)
+        finally:
+            # Abort a clone that is no longer needed instead of waiting for it
+            if clone.poll() is None:
+                clone.kill()
+                clone.wait()
+            shutil.rmtree(template_dir, ignore_errors=True)
 
-            # Success!
-            console.print("\n" + format_message("success", "Project ready!"))
-
+        try:
+            project_path = os.path.abspath(project_name)
             if not quiet:
-                console.print("\n" + format_message("info", "Next steps:"))
-                console.print(f"  1. cd {project_name}")
-                console.print("  2. npm install")
-                console.print("  3. npm run dev")
+                console.print(
+                    format_message("info", f"Project location: [bold]{project_path}[/bold]")
+                )
 
-        finally:
-            os.chdir(original_dir)
+            # Setup project
+            original_dir = os.getcwd()
+            os.chdir(project_path)
 
-    except Exception as e:
-        # Cleanup on failure
-        shutil.rmtree(project_name, ignore_errors=True)
-        raise e
+            try:
+                # Setup Supabase
+                if not quiet:
+                    console.print("\n" + format_message("info", "Configuring Supabase..."))
+                if not builder.setup_supabase(spec):
+                    raise Exception("Supabase setup failed")
+
+                # Generate code
+                with create_progress() as progress:
+                    task = progress.add_task("🚀 Generating application...")
+                    code_agent = CodeAgent(project_path, spec)
+                    success = await code_agent.transform_template()
+                    if not success:
+                        raise Exception("Code generation failed")
+                    progress.update(task, completed=True)
+
+                # Success!
+                console.print("\n" + format_message("success", "Project ready!"))
+
+                if not quiet:
+                    console.print("\n" + format_message("info", "Next steps:"))
+                    console.print(f"  1. cd {project_name}")
+                    console.print("  2. npm install")
+                    console.print("  3. npm run dev")
+
+            finally:
+                os.chdir(original_dir)
+
+        except Exception as e:
+            # Cleanup on failure
+            shutil.rmtree(project_name, ignore_errors=True)
+            raise e
 
 
 def get_project_status():
@@ -583,32 +613,31 @@ def plan(
         $ berry plan "Blog with comments" -o blog_spec.json
     """
     try:
-        builder = ProjectBuilder()
-
-        # Clean project name
-        project_name = os.path.basename(os.getcwd()).lower().replace(" ", "-")
+        with ProjectBuilder() as builder:
+            # Clean project name
+            project_name = os.path.basename(os.getcwd()).lower().replace(" ", "-")
 
-        # Analyze requirements
-        with create_progress() as progress:
-            task = progress.add_task("📝 Analyzing requirements...")
-            intent = builder.understand_intent(prompt)
-            progress.update(task, completed=True)
+            # Analyze requirements
+            with create_progress() as progress:
+                task = progress.add_task("📝 Analyzing requirements...")
+                intent = builder.understand_intent(prompt)
+                progress.update(task, completed=True)
 
-        # Display features
-        if not quiet:
-            console.print("\n" + format_message("info", "Planned features:"))
-            display_features(intent.features)
+            # Display features
+            if not quiet:
+                console.print("\n" + format_message("info", "Planned features:"))
+                display_features(intent.features)
 
-        # Verify features
-        if not quiet and typer.confirm("\nModify features?", default=False):
-            intent = builder.verify_with_user_loop(intent)
+            # Verify features
+            if not quiet and typer.confirm("\nModify features?", default=False):
+                intent = builder.verify_with_user_loop(intent)
 
-        # Generate specification
-        with create_progress() as progress:
-            task = progress.add_task("🔨 Generating specification...")
-            spec = builder.create_spec(intent)
-            spec.name = project_name
-            progress.update(task, completed=True)
+            # Generate specification
+            with create_progress() as progress:
+                task = progress.add_task("🔨 Generating specification...")
+                spec = builder.create_spec(intent)
+                spec = spec.model_copy(update={"name": project_name})
+                progress.update(task, completed=True)
 
         # Create specs directory
         specs_dir = Path("specs")
@@ -622,8 +651,7 @@ def plan(
         spec_file = specs_dir / output
         
         # Save specification
-        with open(spec_file, "w") as f:
-            json.dump(spec.dict(), f, indent=2)
+        spec_file.write_text(spec.model_dump_json(indent=2))
 
         console.print("\n" + format_message("success", f"Specification saved: {spec_file}"))
 
@@ -0,0 +1,44 @@
+import asyncio
+
+from lumos import lumos
+from openai import (
+    APIConnectionError,
+    APITimeoutError,
+    InternalServerError,
+    RateLimitError,
+)
+from tenacity import (
+    retry,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_exponential_jitter,
+)
+
+# Upper bounds on a single LLM request, a stalled call is retried instead of hanging the run.
+# Short calls (intent, features, embeddings, error analysis) use LLM_TIMEOUT; calls that
+# generate whole files or specs legitimately take minutes and use LLM_LONG_TIMEOUT.
+LLM_TIMEOUT = 60.0
+LLM_LONG_TIMEOUT = 600.0
+
+# Transient provider failures worth retrying: timeouts, 429s, dropped connections and 5xx
+RETRYABLE_ERRORS = (
+    APITimeoutError,
+    RateLimitError,
+    APIConnectionError,
+    InternalServerError,
+    asyncio.TimeoutError,
+)
+
+# Exponential backoff with jitter, so concurrent callers do not retry in lockstep
+llm_retry = retry(
+    retry=retry_if_exception_type(RETRYABLE_ERRORS),
+    wait=wait_exponential_jitter(initial=1, max=30),
+    stop=stop_after_attempt(5),
+    reraise=True,
+)
+
+
+@llm_retry
+async def call_ai_async(timeout: float = LLM_TIMEOUT, **kwargs):
+    """lumos.call_ai_async with a bounded timeout and retries on transient errors"""
+    return await asyncio.wait_for(lumos.call_ai_async(**kwargs), timeout)
@@ -0,0 +1,184 @@
+import functools
+import hashlib
+import os
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+import orjson
+from pydantic import BaseModel
+
+from blueberry.llm import LLM_TIMEOUT, llm_retry
+
+# Responses are stored as one JSON file per request, keyed by the request hash
+LLM_CACHE_DIR = Path(".cache") / "llm"
+SEMANTIC_CACHE_FILE = Path(".cache") / "features.npz"
+
+
+def cache_disabled() -> bool:
+    """Check whether LLM response caching has been turned off via BERRY_NO_CACHE"""
+    return bool(os.getenv("BERRY_NO_CACHE"))
+
+
+@functools.cache
+def _schema_fingerprint(response_format: type[BaseModel] | None) -> str:
+    """Stable string describing the expected response shape"""
+    if response_format is None:
+        return ""
+    schema = orjson.dumps(response_format.model_json_schema(), option=orjson.OPT_SORT_KEYS)
+    return f"{response_format.__name__}:{schema.decode()}"
+
+
+def cache_key(
+    messages: list[dict[str, str]],
+    model: str,
+    response_format: type[BaseModel] | None = None,
+) -> str:
+    """Content-addressed key for an LLM request"""
+    payload = orjson.dumps(
+        {
+            "model": model,
+            "messages": messages,
+            "response_format": _schema_fingerprint(response_format),
+        },
+        option=orjson.OPT_SORT_KEYS,
+    )
+    return hashlib.sha256(payload).hexdigest()
+
+
+def cached_llm(func: Callable) -> Callable:
+    """Cache the result of an LLM call on disk.
+
+    The wrapped function must take ``messages``, ``model`` and optionally
+    ``response_format`` as keyword arguments. Structured responses are stored
+    with ``model_dump_json`` and rebuilt with ``model_validate_json`` on a hit;
+    plain string responses are stored as-is.
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args, messages, model, response_format=None, **kwargs):
+        if cache_disabled():
+            return func(
+                *args, messages=messages, model=model, response_format=response_format, **kwargs
+            )
+
+        cache_file = LLM_CACHE_DIR / f"{cache_key(messages, model, response_format)}.json"
+        if cache_file.exists():
+            try:
+                cached = cache_file.read_bytes()
+                if response_format is not None:
+                    return response_format.model_validate_json(cached)
+                return orjson.loads(cached)
+            except Exception:
+                # Corrupt or outdated entry, fall through and refresh it
+                pass
+
+        result = func(
+            *args, messages=messages, model=model, response_format=response_format, **kwargs
+        )
+
+        try:
+            LLM_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            if isinstance(result, BaseModel):
+                content = result.model_dump_json().encode()
+            else:
+                content = orjson.dumps(result)
+            tmp_file = cache_file.with_suffix(".tmp")
+            tmp_file.write_bytes(content)
+            tmp_file.replace(cache_file)
+        except OSError:
+            # Caching is best-effort, never fail the call because of it
+            pass
+
+        return result
+
+    return wrapper
+
+
+class SemanticCache:
+    """Reuse LLM outputs for inputs that are paraphrases of earlier ones.
+
+    Inputs are embedded and compared by cosine similarity against previously
+    seen inputs; above ``threshold`` the stored output is returned instead of
+    calling the model again. The index is persisted to ``path`` as an ``.npz``.
+    """
+
+    def __init__(
+        self,
+        client,
+        path: Path = SEMANTIC_CACHE_FILE,
+        threshold: float = 0.93,
+        model: str = "text-embedding-3-small",
+    ):
+        self.client = client
+        self.path = Path(path)
+        self.threshold = threshold
+        self.model = model
+        self.matrix = np.empty((0, 0), dtype=np.float32)
+        self.outputs: list[str] = []
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            with np.load(self.path) as data:
+                if str(data["model"]) != self.model:
+                    return
+                self.matrix = data["matrix"].astype(np.float32)
+                self.outputs = [str(output) for output in data["outputs"]]
+        except Exception:
+            # Unreadable index, start from scratch
+            self.matrix = np.empty((0, 0), dtype=np.float32)
+            self.outputs = []
+
+    def _save(self) -> None:
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            np.savez(
+                self.path,
+                matrix=self.matrix,
+                outputs=np.array(self.outputs, dtype=str),
+                model=np.array(self.model),
+            )
+        except OSError:
+            pass
+
+    @llm_retry
+    def embed(self, texts: list[str]) -> np.ndarray:
+        """Embed several texts in a single request, returning unit-norm rows"""
+        response = self.client.embeddings.create(model=self.model, input=texts, timeout=LLM_TIMEOUT)
+        embeddings = np.array([item.embedding for item in response.data], dtype=np.float32)
+        return embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+
+    def lookup(self, embedding: np.ndarray) -> str | None:
+        """Return the cached output closest to ``embedding`` if similar enough"""
+        if not self.outputs:
+            return None
+        sims = self.matrix @ embedding
+        best = int(np.argmax(sims))
+        if sims[best] > self.threshold:
+            return self.outputs[best]
+        return None
+
+    def add(self, embedding: np.ndarray, output: str) -> None:
+        """Store ``output`` for the input represented by ``embedding``"""
+        if self.outputs:
+            self.matrix = np.vstack([self.matrix, embedding])
+        else:
+            self.matrix = embedding.reshape(1, -1)
+        self.outputs.append(output)
+        self._save()
+
+    def get_or_compute(self, text: str, compute: Callable[[str], str]) -> str:
+        """Return the cached output for ``text`` or compute and store it"""
+        if cache_disabled():
+            return compute(text)
+
+        embedding = self.embed([text])[0]
+        if (cached := self.lookup(embedding)) is not None:
+            return cached
+
+        output = compute(text)
+        self.add(embedding, output)
+        return output
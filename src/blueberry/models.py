@@ -1,15 +1,22 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, List, Any
 from enum import Enum
+import copy
 
 
-class Intent(BaseModel):
+class FrozenModel(BaseModel):
+    """Immutable base for all blueberry models"""
+
+    model_config = ConfigDict(frozen=True)
+
+
+class Intent(FrozenModel):
     features: list[str] = Field(
         ..., description="Core features extracted from user's request"
     )
 
 
-class SupabaseTable(BaseModel):
+class SupabaseTable(FrozenModel):
     name: str = Field(..., description="Name of the table")
     sql_schema: str = Field(
         ...,
@@ -17,39 +24,81 @@ class SupabaseTable(BaseModel):
     )
 
 
-class APIRoute(BaseModel):
+class APIRoute(FrozenModel):
     path: str = Field(..., description="API route path (e.g., /api/users)")
     method: str = Field(..., description="HTTP method (GET, POST, PUT, DELETE)")
     description: str = Field(..., description="What this API route does and returns")
     query: str = Field(..., description="Supabase query or SQL to be used")
 
 
-class Page(BaseModel):
+class Page(FrozenModel):
     path: str = Field(..., description="Route path (e.g., /dashboard)")
     description: str = Field(..., description="What this page does")
     api_routes: list[str] = Field(..., description="API routes this page uses")
     components: list[str] = Field(..., description="UI components used on this page")
 
 
-class Component(BaseModel):
+class Component(FrozenModel):
     name: str = Field(..., description="Name of the component")
     description: str = Field(..., description="What this component does")
     is_client: bool = Field(..., description="Whether this is a client component")
 
 
-class ProjectStructure(BaseModel):
+class ProjectStructure(FrozenModel):
     pages: list[Page] = Field(..., description="App pages/routes")
     components: list[Component] = Field(..., description="Reusable UI components")
     api_routes: list[APIRoute] = Field(..., description="API endpoints")
     database: list[SupabaseTable] = Field(..., description="Database tables")
 
 
-class ProjectSpec(BaseModel):
+class ProjectSpec(FrozenModel):
     name: str = Field(..., description="Project name")
     description: str = Field(..., description="Project purpose")
     features: list[str] = Field(..., description="Features to implement")
     structure: ProjectStructure = Field(..., description="Project structure")
 
+    def summary(self) -> dict[str, Any]:
+        """Minimal view of the spec: names of everything it contains, without details"""
+        return {
+            "name": self.name,
+            "description": self.description,
+            "features": self.features,
+            "pages": [page.path for page in self.structure.pages],
+            "components": [component.name for component in self.structure.components],
+            "api_routes": [f"{route.method} {route.path}" for route in self.structure.api_routes],
+            "database": [table.name for table in self.structure.database],
+        }
+
+
+def strict_json_schema(model: type[BaseModel]) -> dict[str, Any]:
+    """JSON schema of a model in the form accepted by OpenAI strict structured outputs"""
+    schema = model.model_json_schema()
+    definitions = schema.get("$defs", {})
+
+    def _make_strict(node: Any) -> None:
+        if isinstance(node, dict):
+            if "$ref" in node and len(node) > 1:
+                # Strict mode does not allow other keywords next to a $ref,
+                # inline the definition instead (as the OpenAI SDK does)
+                name = node.pop("$ref").removeprefix("#/$defs/")
+                node.update({**copy.deepcopy(definitions[name]), **node})
+            if node.get("type") == "object" and "properties" in node:
+                node["additionalProperties"] = False
+                node["required"] = list(node["properties"])
+            for value in node.values():
+                _make_strict(value)
+        elif isinstance(node, list):
+            for value in node:
+                _make_strict(value)
+
+    _make_strict(schema)
+    return schema
+
+
+# Schemas are derived once at import instead of on every structured LLM call
+INTENT_SCHEMA = strict_json_schema(Intent)
+PROJECT_SPEC_SCHEMA = strict_json_schema(ProjectSpec)
+
 
 class FileMode(str, Enum):
     CREATE = "create"
@@ -57,7 +106,7 @@ class FileMode(str, Enum):
     DELETE = "delete"
 
 
-class FileContent(BaseModel):
+class FileContent(FrozenModel):
     path: str = Field(..., description="Relative path from project root")
     content: str = Field(..., description="Complete file content")
     mode: FileMode = Field(default=FileMode.CREATE, description="File operation mode")
@@ -66,7 +115,7 @@ class FileContent(BaseModel):
     )
 
 
-class GeneratedCode(BaseModel):
+class GeneratedCode(FrozenModel):
     files: list[FileContent] = Field(..., description="List of files to create/modify")
     dependencies: list[str] = Field(
         default_factory=list, description="Additional npm dependencies needed"
@@ -76,7 +125,19 @@ class GeneratedCode(BaseModel):
     )
 
 
-class BuildError(BaseModel):
+class ItemPlan(FrozenModel):
+    index: int = Field(..., description="Index of the planned item in the request")
+    files: list[FileContent] = Field(..., description="Files to create/modify for this item")
+    dependencies: list[str] = Field(
+        default_factory=list, description="Additional npm dependencies needed"
+    )
+
+
+class BatchPlan(FrozenModel):
+    items: list[ItemPlan] = Field(..., description="One plan per requested item")
+
+
+class BuildError(FrozenModel):
     file: str = Field(..., description="File path where error occurred")
     line: int = Field(None, description="Line number of error")
     column: int = Field(None, description="Column number of error")
@@ -85,10 +146,10 @@ class BuildError(BaseModel):
     code: str = Field(None, description="Error code if available")
 
 
-class BuildErrorReport(BaseModel):
+class BuildErrorReport(FrozenModel):
     errors: list[BuildError] = Field(..., description='List of build errors extracted from logs')
 
-class ErrorAnalysis(BaseModel):
+class ErrorAnalysis(FrozenModel):
     """AI analysis of a build error"""
     cause: str = Field(..., description="Root cause of the error")
     suggested_fix: str = Field(..., description="Suggested approach to fix the error") 
@@ -96,14 +157,14 @@ class ErrorAnalysis(BaseModel):
     dependencies: list[str] = Field([], description="Any npm dependencies that need to be installed")
 
 
-class AgentAction(BaseModel):
+class AgentAction(FrozenModel):
     """Action to be taken by the repair agent"""
     tool: str = Field(..., description="Name of the tool to use")
     input: str = Field(..., description="Input for the tool as a string")
     thought: str = Field(..., description="Reasoning behind this action")
 
 
-class AgentResponse(BaseModel):
+class AgentResponse(FrozenModel):
     """Response from the repair agent's AI"""
     thought: str = Field(..., description="Current thinking about the problem")
     action: Optional[AgentAction] = Field(None, description="Next action to take, if any")
@@ -111,7 +172,7 @@ class AgentResponse(BaseModel):
     explanation: Optional[str] = Field(None, description="Explanation of the status if fixed/failed")
 
 
-class FileOperation(BaseModel):
+class FileOperation(FrozenModel):
     """Result of a file operation"""
     success: bool = Field(..., description="Whether the operation succeeded")
     message: str = Field(..., description="Description of what happened")
@@ -2,7 +2,7 @@ from pathlib import Path
 import shutil
 from datetime import datetime
 from rich.console import Console
-from lumos import lumos
+from blueberry.llm import LLM_LONG_TIMEOUT, call_ai_async
 from typing import List, Dict, Any, Optional
 from blueberry.models import (
     BuildError,
@@ -46,7 +46,7 @@ class RepairAgent:
             Build Output:
             {build_output}"""
 
-            response = await lumos.call_ai_async(
+            response = await call_ai_async(
                 messages=[
                     {"role": "system", "content": "You are an expert at analyzing Next.js and TypeScript build errors."},
                     {"role": "user", "content": prompt}
@@ -159,10 +159,11 @@ class RepairAgent:
             
             # Get next action from AI
             messages.append({"role": "user", "content": next_prompt})
-            response = await lumos.call_ai_async(
+            response = await call_ai_async(
                 messages=messages,
                 model="gpt-4o",
-                response_format=AgentResponse
+                response_format=AgentResponse,
+                timeout=LLM_LONG_TIMEOUT,
             )
             self.console.print(f"\n[dim]{response.model_dump_json(indent=2)}[/dim]")
             messages.append({"role": "assistant", "content": response.model_dump_json()})
@@ -319,12 +320,13 @@ class RepairAgent:
             Provide only the fixed code with no explanation:
             """
             
-            response = await lumos.call_ai_async(
+            response = await call_ai_async(
                 messages=[
                     {"role": "system", "content": "You are an expert Next.js TypeScript developer. Provide only the fixed code with no explanation."},
                     {"role": "user", "content": prompt}
                 ],
-                model="gpt-4o"
+                model="gpt-4o",
+                timeout=LLM_LONG_TIMEOUT,
             )
             
             # Clean up the response
@@ -0,0 +1,64 @@
+import asyncio
+from io import StringIO
+
+from rich.console import Console
+
+from blueberry.agents import CodeAgent
+from blueberry.models import BatchPlan, Component, ItemPlan, ProjectSpec, ProjectStructure
+
+COMPONENTS = [
+    Component(name=name, description=f"{name} component", is_client=True)
+    for name in ("Header", "TodoList", "Footer")
+]
+
+
+def make_agent(tmp_path, monkeypatch) -> CodeAgent:
+    monkeypatch.chdir(tmp_path)
+    spec = ProjectSpec(
+        name="todo",
+        description="A todo app",
+        features=["todos"],
+        structure=ProjectStructure(pages=[], components=COMPONENTS, api_routes=[], database=[]),
+    )
+    agent = CodeAgent(str(tmp_path), spec)
+    agent.console = Console(file=StringIO(), width=200)
+    return agent
+
+
+def plan(index: int, dependency: str) -> ItemPlan:
+    return ItemPlan(index=index, files=[], dependencies=[dependency])
+
+
+def test_plan_items_replans_missing_items(tmp_path, monkeypatch):
+    agent = make_agent(tmp_path, monkeypatch)
+    requests = []
+
+    async def plan_batch(items, kind, system_prompt):
+        requests.append([item.name for item in items])
+        if len(requests) == 1:
+            # Index 0 missing, index 2 duplicated, index 7 out of range
+            return BatchPlan(items=[plan(2, "first"), plan(1, "b"), plan(2, "second"), plan(7, "x")])
+        return BatchPlan(items=[plan(0, "a")])
+
+    agent._plan_batch = plan_batch
+    planned = asyncio.run(agent._plan_items(COMPONENTS, "component", ""))
+
+    assert requests == [["Header", "TodoList", "Footer"], ["Header"]]
+    assert [item.dependencies for item in planned] == [["a"], ["b"], ["first"]]
+    assert "Warning" not in agent.console.file.getvalue()
+
+
+def test_plan_items_warns_about_unplanned_items(tmp_path, monkeypatch):
+    agent = make_agent(tmp_path, monkeypatch)
+    requests = []
+
+    async def plan_batch(items, kind, system_prompt):
+        requests.append([item.name for item in items])
+        return BatchPlan(items=[plan(1, "b")] if len(requests) == 1 else [])
+
+    agent._plan_batch = plan_batch
+    planned = asyncio.run(agent._plan_items(COMPONENTS, "component", ""))
+
+    assert requests == [["Header", "TodoList", "Footer"], ["Header", "Footer"]]
+    assert [item.dependencies for item in planned] == [["b"]]
+    assert "no plan returned for component(s): Header, Footer" in agent.console.file.getvalue()
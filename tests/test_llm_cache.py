@@ -0,0 +1,132 @@
+from types import SimpleNamespace
+
+from pydantic import BaseModel
+
+from blueberry.llm_cache import LLM_CACHE_DIR, SemanticCache, cache_key, cached_llm
+
+MESSAGES = [{"role": "user", "content": "Build a todo app"}]
+
+
+class Answer(BaseModel):
+    text: str
+
+
+def make_stub(result):
+    calls = []
+
+    @cached_llm
+    def stub(*, messages, model, response_format=None):
+        calls.append(messages)
+        return result
+
+    return stub, calls
+
+
+def test_cache_key_is_stable():
+    assert cache_key(MESSAGES, "gpt-4o") == cache_key(list(MESSAGES), "gpt-4o")
+
+
+def test_cache_key_depends_on_request():
+    key = cache_key(MESSAGES, "gpt-4o")
+    assert key != cache_key(MESSAGES, "gpt-4o-mini")
+    assert key != cache_key([{"role": "user", "content": "Build a blog"}], "gpt-4o")
+    assert key != cache_key(MESSAGES, "gpt-4o", Answer)
+
+
+def test_cached_llm_miss_then_hit(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("BERRY_NO_CACHE", raising=False)
+    stub, calls = make_stub("hello")
+
+    assert stub(messages=MESSAGES, model="gpt-4o") == "hello"
+    assert stub(messages=MESSAGES, model="gpt-4o") == "hello"
+    assert len(calls) == 1
+    assert (LLM_CACHE_DIR / f"{cache_key(MESSAGES, 'gpt-4o')}.json").exists()
+
+
+def test_cached_llm_restores_structured_response(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("BERRY_NO_CACHE", raising=False)
+    stub, calls = make_stub(Answer(text="hello"))
+
+    stub(messages=MESSAGES, model="gpt-4o", response_format=Answer)
+    cached = stub(messages=MESSAGES, model="gpt-4o", response_format=Answer)
+
+    assert cached == Answer(text="hello")
+    assert len(calls) == 1
+
+
+def test_cached_llm_refreshes_corrupt_entry(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("BERRY_NO_CACHE", raising=False)
+    stub, calls = make_stub(Answer(text="hello"))
+    cache_file = LLM_CACHE_DIR / f"{cache_key(MESSAGES, 'gpt-4o', Answer)}.json"
+    cache_file.parent.mkdir(parents=True)
+    cache_file.write_text("not json")
+
+    assert stub(messages=MESSAGES, model="gpt-4o", response_format=Answer) == Answer(text="hello")
+    assert len(calls) == 1
+    assert Answer.model_validate_json(cache_file.read_text()) == Answer(text="hello")
+
+
+def test_cached_llm_disabled(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("BERRY_NO_CACHE", "1")
+    stub, calls = make_stub("hello")
+
+    stub(messages=MESSAGES, model="gpt-4o")
+    stub(messages=MESSAGES, model="gpt-4o")
+
+    assert len(calls) == 2
+    assert not LLM_CACHE_DIR.exists()
+
+
+class FakeEmbeddings:
+    """Embeddings client returning fixed vectors per input text"""
+
+    VECTORS = {
+        "todo app": [1.0, 0.0, 0.0],
+        "a todo list app": [0.99, 0.1, 0.0],
+        "blog": [0.0, 1.0, 0.0],
+    }
+
+    def __init__(self):
+        self.embeddings = self
+        self.requests = []
+
+    def create(self, *, model, input, timeout):
+        self.requests.append(input)
+        return SimpleNamespace(
+            data=[SimpleNamespace(embedding=self.VECTORS[text]) for text in input]
+        )
+
+
+def test_semantic_cache_reuses_similar_inputs(tmp_path, monkeypatch):
+    monkeypatch.delenv("BERRY_NO_CACHE", raising=False)
+    cache = SemanticCache(FakeEmbeddings(), path=tmp_path / "features.npz")
+
+    assert cache.get_or_compute("todo app", lambda text: "todo features") == "todo features"
+    assert cache.get_or_compute("a todo list app", lambda text: "other") == "todo features"
+    assert cache.get_or_compute("blog", lambda text: "blog features") == "blog features"
+
+
+def test_semantic_cache_persists(tmp_path, monkeypatch):
+    monkeypatch.delenv("BERRY_NO_CACHE", raising=False)
+    path = tmp_path / "features.npz"
+    SemanticCache(FakeEmbeddings(), path=path).get_or_compute("todo app", lambda text: "todo features")
+
+    reloaded = SemanticCache(FakeEmbeddings(), path=path)
+
+    assert reloaded.outputs == ["todo features"]
+    assert reloaded.get_or_compute("todo app", lambda text: "other") == "todo features"
+
+
+def test_semantic_cache_discarded_for_other_model(tmp_path, monkeypatch):
+    monkeypatch.delenv("BERRY_NO_CACHE", raising=False)
+    path = tmp_path / "features.npz"
+    SemanticCache(FakeEmbeddings(), path=path).get_or_compute("todo app", lambda text: "todo features")
+
+    reloaded = SemanticCache(FakeEmbeddings(), path=path, model="text-embedding-3-large")
+
+    assert reloaded.outputs == []
+    assert reloaded.get_or_compute("todo app", lambda text: "fresh") == "fresh"
@@ -0,0 +1,20 @@
+import pytest
+from openai.lib._pydantic import to_strict_json_schema
+
+from blueberry.models import (
+    INTENT_SCHEMA,
+    PROJECT_SPEC_SCHEMA,
+    Intent,
+    ProjectSpec,
+    strict_json_schema,
+)
+
+
+@pytest.mark.parametrize("model", [Intent, ProjectSpec])
+def test_strict_json_schema_matches_openai(model):
+    assert strict_json_schema(model) == to_strict_json_schema(model)
+
+
+def test_precomputed_schemas_are_strict():
+    assert INTENT_SCHEMA == to_strict_json_schema(Intent)
+    assert PROJECT_SPEC_SCHEMA == to_strict_json_schema(ProjectSpec)